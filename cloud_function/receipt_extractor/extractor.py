@@ -1,8 +1,7 @@
-import io
 from datetime import datetime, timezone
+from urllib.parse import quote
 import google.auth
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from google.auth.transport.requests import AuthorizedSession
 
 import fitz  # PyMuPDF
 from google.cloud import vision
@@ -17,31 +16,51 @@ except ImportError:
 MIN_TEXT_CHARS_FOR_TEXT_PDF = 200
 MAX_OCR_PAGES = 3          # receipts are usually 1, sometimes 2
 OCR_DPI = 200              # 200–300 is fine; 300 increases cost/latency
+OCR_MAX_WIDTH_PX = 1600    # cap for wide pages (e.g. receipt scanned onto A4)
+OCR_JPEG_QUALITY = 85      # JPEG encodes much faster and smaller than PNG for page renders
+
+# Drive is called over plain REST: one metadata GET and one media GET per file
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{file_id}"
+DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+DRIVE_TIMEOUT_SEC = 60
 
 _vision_client = None
+_drive_session = None
 
 def get_vision_client():
     """Lazy-initialize Vision client to avoid auth errors during imports."""
     global _vision_client
     if _vision_client is None:
+        # Default transport on purpose: gRPC keepalive only pings idle connections with
+        # keepalive_permit_without_calls, and Google frontends GOAWAY clients that ping often.
         _vision_client = vision.ImageAnnotatorClient()
     return _vision_client
 
+def get_drive_session():
+    """Lazy-initialize authorized Drive session so warm invocations reuse credentials."""
+    global _drive_session
+    if _drive_session is None:
+        creds, _ = google.auth.default(scopes=DRIVE_SCOPES)
+        _drive_session = AuthorizedSession(creds)
+    return _drive_session
+
 def process_drive_file(file_id: str) -> dict:
-    creds, _ = google.auth.default()
-    drive = build("drive", "v3", credentials=creds, cache_discovery=False)
+    session = get_drive_session()
 
     # 1) Read metadata (also useful for returning in result)
-    meta = drive.files().get(
-        fileId=file_id,
-        fields="id,name,mimeType,size"
-    ).execute()
+    resp = session.get(
+        _drive_file_url(file_id),
+        params={"fields": "id,name,mimeType,size"},
+        timeout=DRIVE_TIMEOUT_SEC,
+    )
+    resp.raise_for_status()
+    meta = resp.json()
 
     mime_type = meta.get("mimeType", "")
     file_name = meta.get("name", "")
 
     # 2) Download bytes
-    data = download_drive_file_bytes_(drive, file_id)
+    data = download_drive_file_bytes_(session, file_id)
 
     extracted_at = datetime.now(timezone.utc).isoformat()
 
@@ -50,10 +69,7 @@ def process_drive_file(file_id: str) -> dict:
     raw_text = ""
 
     if mime_type == "application/pdf":
-        raw_text = extract_text_from_pdf_bytes_(data)
-        if len(raw_text.strip()) < MIN_TEXT_CHARS_FOR_TEXT_PDF:
-            warnings.append("PDF text layer empty/short; treating as scanned and OCRing pages.")
-            raw_text = ocr_scanned_pdf_bytes_(data, warnings=warnings)
+        raw_text = extract_pdf_text_(data, warnings=warnings)
 
     elif mime_type.startswith("image/"):
         raw_text = ocr_image_bytes_(data)
@@ -84,46 +100,65 @@ def process_drive_file(file_id: str) -> dict:
     }
 
 
-def download_drive_file_bytes_(drive, file_id: str) -> bytes:
-    request = drive.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    return fh.getvalue()
+def _drive_file_url(file_id: str) -> str:
+    # Escape the id so it can't point the authorized session at another path
+    return DRIVE_FILES_URL.format(file_id=quote(file_id, safe=""))
+
+
+def download_drive_file_bytes_(session, file_id: str) -> bytes:
+    resp = session.get(_drive_file_url(file_id), params={"alt": "media"}, timeout=DRIVE_TIMEOUT_SEC)
+    resp.raise_for_status()
+    return resp.content
+
+
+def extract_pdf_text_(pdf_bytes: bytes, warnings=None) -> str:
+    """Text layer of a PDF, OCRing the pages if it is empty/short. Parses the PDF once."""
+    warnings = warnings if warnings is not None else []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        text = _pdf_doc_text(doc)
+        if len(text.strip()) < MIN_TEXT_CHARS_FOR_TEXT_PDF:
+            warnings.append("PDF text layer empty/short; treating as scanned and OCRing pages.")
+            text = _ocr_pdf_doc(doc, warnings)
+    return text
 
 
 def extract_text_from_pdf_bytes_(pdf_bytes: bytes) -> str:
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return _pdf_doc_text(doc)
+
+
+def ocr_scanned_pdf_bytes_(pdf_bytes: bytes, warnings=None) -> str:
+    warnings = warnings if warnings is not None else []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return _ocr_pdf_doc(doc, warnings)
+
+
+def _pdf_doc_text(doc) -> str:
     parts = []
     for i in range(doc.page_count):
         page = doc.load_page(i)
         parts.append(page.get_text("text"))
-    doc.close()
     return "\n".join(parts)
 
 
-def ocr_scanned_pdf_bytes_(pdf_bytes: bytes, warnings=None) -> str:
-    warnings = warnings if warnings is not None else []
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
+def _ocr_pdf_doc(doc, warnings) -> str:
     pages = min(doc.page_count, MAX_OCR_PAGES)
     if doc.page_count > MAX_OCR_PAGES:
         warnings.append(f"PDF has {doc.page_count} pages; OCR limited to first {MAX_OCR_PAGES}.")
 
-    parts = []
-    zoom = OCR_DPI / 72.0  # PDF points are 72 DPI
-    mat = fitz.Matrix(zoom, zoom)
+    images = []
+    max_zoom = OCR_DPI / 72.0  # PDF points are 72 DPI
 
+    # Render sequentially: PyMuPDF is not thread-safe, and the network-bound part
+    # (OCR) is already a single batched request, so there is nothing left to overlap.
     for i in range(pages):
         page = doc.load_page(i)
-        pix = page.get_pixmap(matrix=mat, alpha=False)  # RGB
-        img_bytes = pix.tobytes("png")
-        parts.append(ocr_image_bytes_(img_bytes))
+        width = page.rect.width
+        zoom = max_zoom if width <= 0 else min(max_zoom, OCR_MAX_WIDTH_PX / width)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)  # receipts are black on white
+        images.append(pix.tobytes("jpeg", jpg_quality=OCR_JPEG_QUALITY))
 
-    doc.close()
-    return "\n".join(parts)
+    return "\n".join(ocr_images_bytes_(images))
 
 
 def ocr_image_bytes_(img_bytes: bytes) -> str:
@@ -132,3 +167,24 @@ def ocr_image_bytes_(img_bytes: bytes) -> str:
     if resp.error and resp.error.message:
         raise RuntimeError(f"Vision OCR error: {resp.error.message}")
     return resp.full_text_annotation.text or ""
+
+
+def ocr_images_bytes_(images: list[bytes]) -> list[str]:
+    """OCR several images in a single Vision batch request (one roundtrip for all pages)."""
+    if not images:
+        return []
+    requests = [
+        vision.AnnotateImageRequest(
+            image=vision.Image(content=img_bytes),
+            features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+            image_context=vision.ImageContext(language_hints=["fi", "en"]),
+        )
+        for img_bytes in images
+    ]
+    batch = get_vision_client().batch_annotate_images(requests=requests)
+    texts = []
+    for resp in batch.responses:
+        if resp.error and resp.error.message:
+            raise RuntimeError(f"Vision OCR error: {resp.error.message}")
+        texts.append(resp.full_text_annotation.text or "")
+    return texts
@@ -1,16 +1,23 @@
-import json
+import os
+import orjson
 import functions_framework
-from extractor import process_drive_file
+from extractor import get_drive_session, process_drive_file
+
+# Set up the Drive session while the instance starts rather than on its first request.
+# Only on Cloud Functions/Run (K_SERVICE is set there); locally the credential lookup
+# would probe the metadata server, and the session is built lazily on first request instead.
+if os.environ.get("K_SERVICE"):
+    get_drive_session()
 
 @functions_framework.http
 def main(request):
     body = request.get_json(silent=True) or {}
     file_id = body.get("fileId")
     if not file_id:
-        return (json.dumps({"ok": False, "error": "Missing fileId"}), 400, {"Content-Type": "application/json"})
+        return (orjson.dumps({"ok": False, "error": "Missing fileId"}), 400, {"Content-Type": "application/json"})
 
     try:
         result = process_drive_file(file_id)
-        return (json.dumps({"ok": True, "result": result}, ensure_ascii=False), 200, {"Content-Type": "application/json"})
+        return (orjson.dumps({"ok": True, "result": result}), 200, {"Content-Type": "application/json"})
     except Exception as e:
-        return (json.dumps({"ok": False, "error": str(e)}), 500, {"Content-Type": "application/json"})
\ No newline at end of file
+        return (orjson.dumps({"ok": False, "error": str(e)}), 500, {"Content-Type": "application/json"})
\ No newline at end of file
@@ -0,0 +1,24 @@
+from unittest.mock import Mock
+from ... import extractor
+
+def test_process_drive_file_escapes_id_and_sets_timeouts(monkeypatch):
+    meta_resp = Mock()
+    meta_resp.json.return_value = {"id": "abc", "name": "receipt.jpg", "mimeType": "image/jpeg"}
+    media_resp = Mock()
+    media_resp.content = b"fake-bytes"
+    session = Mock()
+    session.get.side_effect = [meta_resp, media_resp]
+    monkeypatch.setattr(extractor, "get_drive_session", lambda: session)
+    monkeypatch.setattr(extractor, "ocr_image_bytes_", lambda data: "K-market\nYHTEENSÄ 12,47\n")
+
+    result = extractor.process_drive_file("../about?x=1/y")
+
+    expected_url = "https://www.googleapis.com/drive/v3/files/..%2Fabout%3Fx%3D1%2Fy"
+    meta_call, media_call = session.get.call_args_list
+    assert meta_call.args == (expected_url,)
+    assert meta_call.kwargs["params"] == {"fields": "id,name,mimeType,size"}
+    assert meta_call.kwargs["timeout"] == extractor.DRIVE_TIMEOUT_SEC
+    assert media_call.args == (expected_url,)
+    assert media_call.kwargs["params"] == {"alt": "media"}
+    assert media_call.kwargs["timeout"] == extractor.DRIVE_TIMEOUT_SEC
+    assert result["source"]["file_name"] == "receipt.jpg"
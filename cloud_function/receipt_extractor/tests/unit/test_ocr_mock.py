@@ -15,3 +15,62 @@ def test_ocr_calls_vision_client(monkeypatch):
     out = ocr_image_bytes_(b"fake-bytes")
     assert "YHTEENSÄ" in out
     fake_client.text_detection.assert_called_once()
+
+def test_scanned_pdf_pages_sent_in_one_batch(monkeypatch):
+    import fitz
+    from ... import extractor
+
+    doc = fitz.open()
+    for _ in range(2):
+        doc.new_page()
+    pdf_bytes = doc.tobytes()
+    doc.close()
+
+    fake_client = Mock()
+    page1, page2 = Mock(), Mock()
+    page1.error = None
+    page1.full_text_annotation.text = "K-market"
+    page2.error = None
+    page2.full_text_annotation.text = "YHTEENSÄ 12,47"
+    fake_client.batch_annotate_images.return_value.responses = [page1, page2]
+    monkeypatch.setattr(extractor, "get_vision_client", lambda: fake_client)
+
+    out = extractor.ocr_scanned_pdf_bytes_(pdf_bytes)
+    assert out == "K-market\nYHTEENSÄ 12,47"
+    fake_client.batch_annotate_images.assert_called_once()
+    assert len(fake_client.batch_annotate_images.call_args.kwargs["requests"]) == 2
+    fake_client.text_detection.assert_not_called()
+
+def test_extract_pdf_text_falls_back_to_ocr_for_scanned_pdf(monkeypatch):
+    import fitz
+    from ... import extractor
+
+    doc = fitz.open()
+    doc.new_page()
+    pdf_bytes = doc.tobytes()
+    doc.close()
+
+    fake_client = Mock()
+    page = Mock()
+    page.error = None
+    page.full_text_annotation.text = "K-market"
+    fake_client.batch_annotate_images.return_value.responses = [page]
+    monkeypatch.setattr(extractor, "get_vision_client", lambda: fake_client)
+
+    warnings = []
+    assert extractor.extract_pdf_text_(pdf_bytes, warnings=warnings) == "K-market"
+    assert len(warnings) == 1
+
+def test_extract_pdf_text_uses_text_layer_without_ocr(monkeypatch):
+    from pathlib import Path
+    from ... import extractor
+
+    fake_client = Mock()
+    monkeypatch.setattr(extractor, "get_vision_client", lambda: fake_client)
+
+    pdf_bytes = (Path(__file__).parent.parent / "fixtures" / "pdf_test_k_market1.pdf").read_bytes()
+    warnings = []
+    text = extractor.extract_pdf_text_(pdf_bytes, warnings=warnings)
+    assert "YHTEENSÄ" in text
+    assert warnings == []
+    fake_client.batch_annotate_images.assert_not_called()
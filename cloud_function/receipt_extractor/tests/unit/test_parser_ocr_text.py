@@ -1,5 +1,5 @@
 from pathlib import Path
-from ...parser import parse_receipt_text_
+from ...parser import parse_receipt_text_, extract_merchant, normalize_text
 
 FIXTURES = Path(__file__).parent.parent / "fixtures"
 
@@ -40,6 +40,7 @@ def test_parse_ocr_text_ksupermarket():
     assert out["total"] == 12.47, f"Expected 12.47, got {out['total']}"
     assert out["currency"] == "EUR", f"Expected 'EUR', got '{out['currency']}'"
     assert len(out["items"]) == 5, f"Expected 5 items, got {len(out['items'])}"
+    assert all(set(item) == {"name", "amount"} for item in out["items"]), "Items should only carry name and amount"
     
     # Expected items
     expected_items = [
@@ -55,3 +56,15 @@ def test_parse_ocr_text_ksupermarket():
             f"Item {i+1} name: expected '{expected['name']}', got '{out['items'][i]['name']}'"
         assert out["items"][i]["amount"] == expected["amount"], \
             f"Item {i+1} amount: expected {expected['amount']}, got {out['items'][i]['amount']}"
+
+def test_extract_merchant_strips_postal_code_and_phone():
+    assert extract_merchant(["K-market Töölöntori, 00260 Helsinki Puh. (09) 4342630"]) == "K-market Töölöntori"
+    assert extract_merchant(["K-market Töölöntori Tel. 09 4342630"]) == "K-market Töölöntori"
+
+def test_parse_empty_text():
+    out = parse_receipt_text_("")
+    assert out == {"merchant": "", "date": "", "total": None, "currency": "EUR", "items": []}
+
+def test_normalize_text_splits_only_on_cr_lf():
+    assert normalize_text("a\r\nb\rc\n\n d ") == ["a", "b", "c", "d"]
+    assert normalize_text("x\x0cy 1,00") == ["x\x0cy 1,00"]
@@ -8,45 +8,51 @@ from datetime import date
 # Regex patterns
 DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
 TOTAL_RE = re.compile(r"^YHTEENSÄ\s+(\d+[.,]\d{2})", re.I)
-ITEM_PRICE_RE = re.compile(r"(.*?)(\d+[.,]\d{2})$")
+# One pass per line: either a standalone amount, or a name followed by a price
+LINE_RE = re.compile(r"^(?P<amt>\d+[.,]\d{2})$|^(?P<name>.*?)(?P<price>\d+[.,]\d{2})\s*$")
+STANDALONE_AMOUNT_RE = re.compile(r"^(\d+[.,]\d{2})\s*$")
+# Phone numbers (Puh., Tel.) anywhere, or a trailing postal code + city
+# (the lookahead still allows phone numbers after the city)
+_PHONE = r"\s*(?:Puh|Tel)\.?\s*\(?\d+\)?[\s\d\-]+"
+MERCHANT_CLEAN_RE = re.compile(
+    rf"{_PHONE}|,?\s*\d{{5}}\s+[A-ZÅÄÖa-zåäö\s]+(?=(?:{_PHONE})*$)", re.I
+)
+TXN_ID_RE = re.compile(r"[A-Z]\d{3,}|M\d{6}")
+VOL_RE = re.compile(r"\s+\d+[.,]\d+L[^\s]*", re.I)
+TRAILING_DEC_RE = re.compile(r"\s+\d+[.,]\d{1,2}$")
 
 # Text preprocessing
+def _parse_amount(s: str) -> float:
+    """Convert a matched "12,34" / "12.34" amount to float.
+
+    float() on the normalised string benchmarks faster than hand-parsing
+    the digits into cents, and yields the same value.
+    """
+    return float(s.replace(",", "."))
+
 def normalize_text(text: str) -> list[str]:
     """Split text into non-empty trimmed lines."""
-    return [
-        l.strip()
-        for l in text.replace("\r", "\n").split("\n")
-        if l.strip()
-    ]
+    # Only \r and \n break lines (str.splitlines() would also split on \x0c, \x85, \u2028 etc.);
+    # "\r\n" becomes an empty line, which is dropped with the other blanks
+    lines = text.replace("\r", "\n").split("\n")
+    return [s for s in (l.strip() for l in lines) if s]
 
 # Field extractors
+def _clean_merchant(line: str) -> str:
+    """Remove phone number, postal code and city from a merchant line."""
+    return MERCHANT_CLEAN_RE.sub("", line).strip()
+
 def extract_merchant(lines):
     """Extract merchant name from first lines (heuristic-based)."""
     for l in lines[:10]:
         if "market" in l.lower():
-            # Clean up: remove postal code, city, phone number
-            merchant = l
-            # Remove phone numbers (Puh., Tel., etc.)
-            merchant = re.sub(r'\s*Puh\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-            merchant = re.sub(r'\s*Tel\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-            # Remove postal code and city (5-digit code followed by city name)
-            merchant = re.sub(r',?\s*\d{5}\s+[A-ZÅÄÖa-zåäö\s]+$', '', merchant)
-            return merchant.strip()
+            return _clean_merchant(l)
         if l.isupper() and len(l) > 5:
-            # Clean up uppercase merchant names
-            merchant = l
-            merchant = re.sub(r'\s*Puh\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-            merchant = re.sub(r'\s*Tel\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-            merchant = re.sub(r',?\s*\d{5}\s+[A-ZÅÄÖa-zåäö\s]+$', '', merchant)
-            return merchant.strip()
+            return _clean_merchant(l)
     
     # Fallback: first line with cleanup
     if lines:
-        merchant = lines[0]
-        merchant = re.sub(r'\s*Puh\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-        merchant = re.sub(r'\s*Tel\.?\s*\(?\d+\)?[\s\d\-]+', '', merchant, flags=re.IGNORECASE)
-        merchant = re.sub(r',?\s*\d{5}\s+[A-ZÅÄÖa-zåäö\s]+$', '', merchant)
-        return merchant.strip()
+        return _clean_merchant(lines[0])
     
     return ""
 
@@ -61,19 +67,22 @@ def extract_date(lines):
 
 def extract_total(lines):
     """Extract total amount from YHTEENSÄ line."""
+    # Scan top-down and stop at the first marker: the VAT breakdown near the
+    # bottom also starts with YHTEENSÄ, but lists the net amount first.
     for i, l in enumerate(lines):
-        # Check if line contains the total marker
-        if "YHTEENSÄ" in l.upper() or "TOTAL" in l.upper() or "SUMMA" in l.upper():
+        # Check if line contains the total marker (uppercase once, not per marker)
+        u = l.upper()
+        if "YHTEENSÄ" in u or "TOTAL" in u or "SUMMA" in u:
             # Check same line first
             m = TOTAL_RE.search(l)
             if m:
-                return float(m.group(1).replace(",", "."))
+                return _parse_amount(m.group(1))
             # Check next few lines for the amount
             for j in range(i + 1, min(i + 5, len(lines))):
                 # Look for standalone amount
-                amount_match = re.match(r'^(\d+[.,]\d{2})\s*$', lines[j])
+                amount_match = STANDALONE_AMOUNT_RE.match(lines[j])
                 if amount_match:
-                    return float(amount_match.group(1).replace(",", "."))
+                    return _parse_amount(amount_match.group(1))
     return None
 
 def extract_items(lines):
@@ -85,6 +94,13 @@ def extract_items(lines):
     
     Always uses the next line as price if it's just a decimal amount.
     """
+    # Classify each line once (it is looked at both as "next" and "current" line), but only
+    # up to the line the loop stops at: the total usually comes well before the end
+    stop = next(
+        (k for k, l in enumerate(lines) if l.startswith("YHTEENSÄ") or "CARD TRANSACTION" in l),
+        len(lines) - 1,
+    )
+    matches = [LINE_RE.match(l) for l in lines[:stop + 1]]
     items = []
     i = 0
     while i < len(lines):
@@ -93,7 +109,7 @@ def extract_items(lines):
         # Stop at total line
         if l.startswith("YHTEENSÄ"):
             break
-        if set(l) == {"-"}:
+        if l and not l.lstrip("-"):  # "-----" separator row
             i += 1
             continue
         if "CARD TRANSACTION" in l:
@@ -101,23 +117,21 @@ def extract_items(lines):
 
         # Check if next line is just a standalone amount
         if i + 1 < len(lines):
-            next_line = lines[i + 1].strip()
-            # Match lines that are just a decimal amount
-            standalone_amount = re.match(r'^(\d+[.,]\d{2})$', next_line)
+            next_match = matches[i + 1]
             
-            if standalone_amount:
+            if next_match and next_match.group("amt"):
                 # This line is the item name, next line is the price
                 name = l.strip()
                 
                 # Skip lines that look like transaction IDs or codes (e.g., "K021 M026356/0554")
-                if re.search(r'[A-Z]\d{3,}|M\d{6}', name):
+                if TXN_ID_RE.search(name):
                     i += 2
                     continue
                 
                 # Remove volume/size indicators like "0,35L-1L" (OCR artifacts)
-                name = re.sub(r'\s+\d+[.,]\d+L[^\s]*', '', name, flags=re.IGNORECASE)
+                name = VOL_RE.sub('', name)
                 # Remove trailing decimal amounts like "0,51" or "1,51" or "0,20" (misread volumes for bottled drinks)
-                name = re.sub(r'\s+\d+[.,]\d{1,2}$', '', name)
+                name = TRAILING_DEC_RE.sub('', name)
                 name = name.strip()
                 
                 # Skip obvious non-items
@@ -125,7 +139,7 @@ def extract_items(lines):
                     i += 2
                     continue
                 
-                amount = float(standalone_amount.group(1).replace(",", "."))
+                amount = _parse_amount(next_match.group("amt"))
                 
                 if len(name) >= 3 and amount > 0:
                     items.append({
@@ -137,16 +151,16 @@ def extract_items(lines):
                 continue
         
         # If no standalone amount on next line, try matching current line
-        m = ITEM_PRICE_RE.match(l)
-        if m:
-            name = m.group(1).strip()
+        m = matches[i]
+        if m and m.group("price"):
+            name = m.group("name").strip()
             
             # Skip transaction IDs or codes
-            if re.search(r'[A-Z]\d{3,}|M\d{6}', name):
+            if TXN_ID_RE.search(name):
                 i += 1
                 continue
             
-            amount = float(m.group(2).replace(",", "."))
+            amount = _parse_amount(m.group("price"))
             
             # Skip obvious non-items
             if not name.upper().startswith(("ALV", "KORTTI", "PLUSSA", "BONUS")):
@@ -4,6 +4,9 @@ Backup Budget Automation spreadsheets to CSVs.
 - Exports all sheets in a spreadsheet to CSV files under output directory.
 - Can target a single `--spreadsheet-id` or all spreadsheets in a Drive `--folder-id`.
 - Supports `--dry-run` to show what would be backed up without calling APIs.
+- CSVs are gzip-compressed (`.csv.gz`) unless `--no-compress` is given.
+- `--direct-csv` downloads tabs as CSV from the Sheets export endpoint instead of
+  converting API values (tabs it refuses fall back to the values API).
 
 Credentials:
 - Provide service account JSON via env var `GOOGLE_SERVICE_ACCOUNT_KEY_JSON` (contents)
@@ -13,6 +16,7 @@ Usage examples:
   python backup_budget_data.py --spreadsheet-id SPREADSHEET_ID --out-dir ./backups
   python backup_budget_data.py --folder-id DRIVE_FOLDER_ID --out-dir ./backups
   python backup_budget_data.py --spreadsheet-id SPREADSHEET_ID --dry-run
+  python backup_budget_data.py --spreadsheet-id SPREADSHEET_ID --direct-csv --out-dir ./backups
 
 """
 from __future__ import annotations
@@ -22,6 +26,9 @@ import argparse
 import json
 import csv
 import datetime
+import gzip
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
 try:
@@ -31,12 +38,42 @@ except Exception:
     build = None  # type: ignore
     service_account = None  # type: ignore
 
+try:
+    import requests
+    from google.auth.transport.requests import AuthorizedSession
+except Exception:
+    requests = None  # type: ignore
+    AuthorizedSession = None  # type: ignore
+
 
 SCOPES = [
     "https://www.googleapis.com/auth/drive.readonly",
     "https://www.googleapis.com/auth/spreadsheets.readonly",
 ]
 
+# Sheet tabs fetched per values.batchGet request (keeps responses reasonably sized)
+BATCH_GET_MAX_RANGES = 20
+# Spreadsheets exported concurrently from a folder; bounded to stay under API quota
+EXPORT_WORKERS = 8
+# Retries (exponential backoff) for 429/5xx responses, handled by googleapiclient
+API_NUM_RETRIES = 5
+
+# Sheets CSV export endpoint used by --direct-csv (one tab per request, selected by gid)
+CSV_EXPORT_URL = "https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export"
+# Connect/read timeout for the export endpoint (per socket operation, not the whole download)
+CSV_EXPORT_TIMEOUT_SEC = 60
+
+# gzip level for backup CSVs; 6 compresses spreadsheet text well at low CPU cost
+GZIP_COMPRESSLEVEL = 6
+
+# Characters not allowed in file names on common filesystems (incl. Windows)
+_SAFE_TABLE = str.maketrans({c: "_" for c in '/\\:*?"<>|'})
+
+# Network errors that make --direct-csv fall back to the values API for a tab
+_REQUEST_ERRORS = (requests.RequestException,) if requests is not None else ()
+
+_worker = threading.local()
+
 
 def load_credentials_from_env_or_file(service_account_file: Optional[str] = None):
     key_json = os.environ.get("GOOGLE_SERVICE_ACCOUNT_KEY_JSON")
@@ -56,8 +93,13 @@ def list_spreadsheets_in_folder(drive_service, folder_id: str) -> List[dict]:
     query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and trashed = false"
     while True:
         resp = drive_service.files().list(
-            q=query, fields="nextPageToken, files(id, name)", pageToken=page_token, pageSize=100
-        ).execute()
+            q=query,
+            fields="nextPageToken, files(id, name)",
+            pageToken=page_token,
+            pageSize=1000,  # Drive v3 maximum
+            supportsAllDrives=True,
+            includeItemsFromAllDrives=True,
+        ).execute(num_retries=API_NUM_RETRIES)
         files = resp.get("files", [])
         results.extend(files)
         page_token = resp.get("nextPageToken")
@@ -66,36 +108,127 @@ def list_spreadsheets_in_folder(drive_service, folder_id: str) -> List[dict]:
     return results
 
 
-def export_spreadsheet_to_csv(sheets_service, spreadsheet_id: str, out_dir: str):
-    meta = sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields="sheets.properties,title").execute()
+def sheet_range(title: str) -> str:
+    """A1 range covering a whole tab; quoted so titles with spaces or quotes work."""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def tab_file_names(tabs: List[dict]) -> dict:
+    """Map sheetId to a file-safe tab name, suffixing the sheetId where sanitised names collide."""
+    safe = {props.get("sheetId"): (props.get("title") or "sheet").translate(_SAFE_TABLE) for props in tabs}
+    counts = {}
+    for name in safe.values():
+        counts[name.lower()] = counts.get(name.lower(), 0) + 1  # case-insensitive filesystems
+    return {sid: f"{name}_{sid}" if counts[name.lower()] > 1 else name for sid, name in safe.items()}
+
+
+def open_csv_output(path: str, compress: bool, binary: bool = False):
+    """Open a backup CSV for writing, through gzip when `compress` is set."""
+    if binary:
+        return gzip.open(path, "wb", compresslevel=GZIP_COMPRESSLEVEL) if compress else open(path, "wb")
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=GZIP_COMPRESSLEVEL)
+    return open(path, "w", newline="", encoding="utf-8", buffering=1 << 20)
+
+
+def download_sheet_csv(session, spreadsheet_id: str, sheet_id, csv_path: str, compress: bool = True) -> bool:
+    """Stream one tab as CSV from the export endpoint. Returns False if it is unavailable.
+
+    Writes to a temporary file first, so a failed download never leaves a partial CSV behind.
+    """
+    url = CSV_EXPORT_URL.format(spreadsheet_id=spreadsheet_id)
+    params = {"format": "csv", "gid": sheet_id}
+    tmp_path = csv_path + ".tmp"
+    try:
+        with session.get(url, params=params, stream=True, timeout=CSV_EXPORT_TIMEOUT_SEC) as resp:
+            if resp.status_code != 200 or not resp.headers.get("Content-Type", "").startswith("text/csv"):
+                return False
+            with open_csv_output(tmp_path, compress, binary=True) as fh:
+                for chunk in resp.iter_content(chunk_size=1 << 16):
+                    fh.write(chunk)
+        os.replace(tmp_path, csv_path)
+        return True
+    except _REQUEST_ERRORS:
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_spreadsheet_to_csv(sheets_service, spreadsheet_id: str, out_dir: str, session=None, compress: bool = True):
+    meta = sheets_service.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields="sheets.properties,title"
+    ).execute(num_retries=API_NUM_RETRIES)
     spreadsheet_title = meta.get("properties", {}).get("title") or spreadsheet_id
     sheets = meta.get("sheets", [])
-    now = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    base_dir = os.path.join(out_dir, f"{spreadsheet_title}_{spreadsheet_id}")
+    now = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d_%H%M%S")
+    base_dir = os.path.join(out_dir, f"{spreadsheet_title.translate(_SAFE_TABLE)}_{spreadsheet_id}")
     os.makedirs(base_dir, exist_ok=True)
+    path_prefix = f"{base_dir}/{now}_"
+    suffix = ".csv.gz" if compress else ".csv"
+    tabs = [s.get("properties", {}) for s in sheets]
+    file_names = tab_file_names(tabs)
+
+    if session is not None:
+        # Direct CSV export; tabs the endpoint refuses fall back to the values API below
+        remaining = []
+        for props in tabs:
+            csv_path = f"{path_prefix}{file_names[props.get('sheetId')]}{suffix}"
+            if download_sheet_csv(session, spreadsheet_id, props.get("sheetId"), csv_path, compress):
+                print(f"Wrote: {csv_path}")
+            else:
+                remaining.append(props)
+        tabs = remaining
 
-    for s in sheets:
-        title = s.get("properties", {}).get("title")
-        safe_title = title.replace("/", "_") if title else "sheet"
-        csv_path = os.path.join(base_dir, f"{now}_{safe_title}.csv")
-        # Fetch values
-        resp = sheets_service.spreadsheets().values().get(spreadsheetId=spreadsheet_id, range=title).execute()
-        values = resp.get("values", [])
-        with open(csv_path, "w", newline="", encoding="utf-8") as fh:
-            writer = csv.writer(fh)
-            for row in values:
-                writer.writerow(row)
-        print(f"Wrote: {csv_path}")
+    for start in range(0, len(tabs), BATCH_GET_MAX_RANGES):
+        batch = tabs[start:start + BATCH_GET_MAX_RANGES]
+        # Fetch values for several tabs in one request
+        resp = sheets_service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id, ranges=[sheet_range(props.get("title")) for props in batch]
+        ).execute(num_retries=API_NUM_RETRIES)
+        for props, value_range in zip(batch, resp.get("valueRanges", [])):
+            csv_path = f"{path_prefix}{file_names[props.get('sheetId')]}{suffix}"
+            values = value_range.get("values", [])
+            with open_csv_output(csv_path, compress) as fh:
+                csv.writer(fh).writerows(values)
+            print(f"Wrote: {csv_path}")
 
 
 def ensure_clients(creds):
     if build is None or service_account is None:
         raise RuntimeError("google-api-python-client and google-auth are required. See requirements.txt")
-    drive = build("drive", "v3", credentials=creds)
-    sheets = build("sheets", "v4", credentials=creds)
+    # static_discovery: use the discovery docs bundled with googleapiclient, no HTTP fetch
+    drive = build("drive", "v3", credentials=creds, static_discovery=True)
+    sheets = make_sheets_client(creds)
     return drive, sheets
 
 
+def make_sheets_client(creds):
+    return build("sheets", "v4", credentials=creds, static_discovery=True)
+
+
+def make_csv_session(creds):
+    if AuthorizedSession is None:
+        raise RuntimeError("--direct-csv requires the requests package. See requirements.txt")
+    return AuthorizedSession(creds)
+
+
+def export_spreadsheet_in_worker(
+    creds, spreadsheet_id: str, out_dir: str, direct_csv: bool = False, compress: bool = True
+):
+    # googleapiclient's httplib2 transport is not thread-safe: one client per worker thread.
+    # Each client's Http keeps its connection alive, so a thread reuses it for all its exports.
+    sheets = getattr(_worker, "sheets", None)
+    if sheets is None:
+        sheets = _worker.sheets = make_sheets_client(creds)
+    session = None
+    if direct_csv:
+        session = getattr(_worker, "session", None)
+        if session is None:
+            session = _worker.session = make_csv_session(creds)
+    export_spreadsheet_to_csv(sheets, spreadsheet_id, out_dir, session=session, compress=compress)
+
+
 def parse_args(argv: Optional[List[str]] = None):
     p = argparse.ArgumentParser()
     p.add_argument("--spreadsheet-id", help="Spreadsheet ID to backup")
@@ -103,6 +236,12 @@ def parse_args(argv: Optional[List[str]] = None):
     p.add_argument("--out-dir", default="./backups", help="Output directory")
     p.add_argument("--service-account-file", help="Path to service account JSON file")
     p.add_argument("--dry-run", action="store_true", help="Don't call APIs; just print targets")
+    p.add_argument(
+        "--direct-csv",
+        action="store_true",
+        help="Download each tab as CSV from the Sheets export endpoint (falls back to the values API)",
+    )
+    p.add_argument("--no-compress", action="store_true", help="Write plain .csv files instead of .csv.gz")
     return p.parse_args(argv)
 
 
@@ -134,21 +273,30 @@ def main(argv: Optional[List[str]] = None):
 
     if args.spreadsheet_id:
         print(f"Exporting spreadsheet {args.spreadsheet_id}...")
-        export_spreadsheet_to_csv(sheets, args.spreadsheet_id, out_dir)
+        session = make_csv_session(creds) if args.direct_csv else None
+        export_spreadsheet_to_csv(
+            sheets, args.spreadsheet_id, out_dir, session=session, compress=not args.no_compress
+        )
         return
 
     if args.folder_id:
         print(f"Listing spreadsheets in folder {args.folder_id}...")
         files = list_spreadsheets_in_folder(drive, args.folder_id)
         print(f"Found {len(files)} spreadsheets")
-        for f in files:
-            sid = f.get("id")
-            name = f.get("name")
-            print(f"Exporting {name} ({sid})...")
-            try:
-                export_spreadsheet_to_csv(sheets, sid, out_dir)
-            except Exception as e:
-                print(f"Failed to export {sid}: {e}")
+        with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as ex:
+            futures = []
+            for f in files:
+                sid = f.get("id")
+                name = f.get("name")
+                print(f"Exporting {name} ({sid})...")
+                futures.append((sid, ex.submit(
+                    export_spreadsheet_in_worker, creds, sid, out_dir, args.direct_csv, not args.no_compress
+                )))
+            for sid, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Failed to export {sid}: {e}")
         return
 
     print("Nothing to do. Provide --spreadsheet-id or --folder-id")
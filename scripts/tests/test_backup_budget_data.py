@@ -0,0 +1,122 @@
+import csv
+import gzip
+import os
+from unittest.mock import Mock
+
+import backup_budget_data as backup
+
+
+def fake_sheets_service(title, tabs, value_ranges):
+    service = Mock()
+    spreadsheets = service.spreadsheets.return_value
+    spreadsheets.get.return_value.execute.return_value = {
+        "properties": {"title": title},
+        "sheets": [{"properties": props} for props in tabs],
+    }
+    spreadsheets.values.return_value.batchGet.return_value.execute.return_value = {
+        "valueRanges": value_ranges,
+    }
+    return service
+
+
+def written_files(out_dir):
+    (base_dir,) = os.listdir(out_dir)
+    return base_dir, sorted(os.listdir(os.path.join(out_dir, base_dir)))
+
+
+def test_colliding_tab_names_get_sheet_id_suffix(tmp_path):
+    tabs = [{"sheetId": 0, "title": "A/B"}, {"sheetId": 7, "title": "A:B"}, {"sheetId": 9, "title": "Menot"}]
+    service = fake_sheets_service("Budget 2024/25", tabs, [{"values": [["x"]]}] * 3)
+
+    backup.export_spreadsheet_to_csv(service, "sid", str(tmp_path), compress=False)
+
+    base_dir, files = written_files(tmp_path)
+    assert base_dir == "Budget 2024_25_sid"
+    assert [f.split("_", 2)[2] for f in files] == ["A_B_0.csv", "A_B_7.csv", "Menot.csv"]
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content_type="text/csv; charset=utf-8", chunks=(b"a,b\r\n",), error=None):
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+        self._chunks = chunks
+        self._error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        yield from self._chunks
+        if self._error is not None:
+            raise self._error
+
+
+def fake_session(*responses):
+    session = Mock()
+    session.get.side_effect = list(responses)
+    return session
+
+
+def test_direct_csv_writes_exported_tab(tmp_path):
+    tabs = [{"sheetId": 3, "title": "Menot"}]
+    service = fake_sheets_service("Budget", tabs, [])
+    session = fake_session(FakeResponse(chunks=(b"a,b\r\n", b"1,2\r\n")))
+
+    backup.export_spreadsheet_to_csv(service, "sid", str(tmp_path), session=session, compress=False)
+
+    base_dir, (name,) = written_files(tmp_path)
+    assert name.endswith("_Menot.csv")
+    assert (tmp_path / base_dir / name).read_bytes() == b"a,b\r\n1,2\r\n"
+    assert session.get.call_args.kwargs["params"] == {"format": "csv", "gid": 3}
+    assert session.get.call_args.kwargs["timeout"] == backup.CSV_EXPORT_TIMEOUT_SEC
+    service.spreadsheets.return_value.values.return_value.batchGet.assert_not_called()
+
+
+def test_direct_csv_falls_back_to_values_api(tmp_path):
+    import requests
+
+    tabs = [{"sheetId": 1, "title": "Forbidden"}, {"sheetId": 2, "title": "Html"}, {"sheetId": 4, "title": "Broken"}]
+    service = fake_sheets_service("Budget", tabs, [{"values": [["f"]]}, {"values": [["h"]]}, {"values": [["b"]]}])
+    session = fake_session(
+        FakeResponse(status_code=403),
+        FakeResponse(content_type="text/html"),
+        FakeResponse(error=requests.ConnectionError("reset")),
+    )
+
+    backup.export_spreadsheet_to_csv(service, "sid", str(tmp_path), session=session, compress=False)
+
+    base_dir, files = written_files(tmp_path)
+    assert [f.split("_", 2)[2] for f in files] == ["Broken.csv", "Forbidden.csv", "Html.csv"]
+    assert (tmp_path / base_dir / files[0]).read_bytes() == b"b\r\n"  # no partial download left behind
+    batch_get = service.spreadsheets.return_value.values.return_value.batchGet
+    assert batch_get.call_args.kwargs["ranges"] == ["'Forbidden'", "'Html'", "'Broken'"]
+
+
+VALUES = [["Päivä", "Summa", "Kuvaus"], ["2024-01-05", "12,47", 'K-market, "ruoka"'], ["2024-01-06", "", "rivi\nkaksi"]]
+
+
+def test_values_are_gzipped_by_default(tmp_path):
+    service = fake_sheets_service("Budget", [{"sheetId": 0, "title": "Menot"}], [{"values": VALUES}])
+
+    backup.export_spreadsheet_to_csv(service, "sid", str(tmp_path))
+
+    base_dir, (name,) = written_files(tmp_path)
+    assert name.endswith("_Menot.csv.gz")
+    with gzip.open(tmp_path / base_dir / name, "rt", newline="", encoding="utf-8") as fh:
+        assert list(csv.reader(fh)) == VALUES
+
+
+def test_no_compress_writes_plain_csv(tmp_path, monkeypatch):
+    service = fake_sheets_service("Budget", [{"sheetId": 0, "title": "Menot"}], [{"values": VALUES}])
+    monkeypatch.setattr(backup, "load_credentials_from_env_or_file", lambda path: object())
+    monkeypatch.setattr(backup, "ensure_clients", lambda creds: (Mock(), service))
+
+    backup.main(["--spreadsheet-id", "sid", "--out-dir", str(tmp_path), "--no-compress"])
+
+    base_dir, (name,) = written_files(tmp_path)
+    assert name.endswith("_Menot.csv")
+    with open(tmp_path / base_dir / name, newline="", encoding="utf-8") as fh:
+        assert list(csv.reader(fh)) == VALUES